@@ -1,38 +1,140 @@
+import os
 import streamlit as st
 import pandas as pd
-import numpy as np
 from scripts.file_parser import extract_shapefile
 from scripts.map_renderer import render_map
 from scripts.llm_mapper import suggest_column_mapping, EXPECTED_FIELDS
 from scripts.llm_query import query_to_filter
+from scripts.forecasting import prioritize_segments, unpriced_types, FORECAST_FIELDS
+from scripts.chunked import (
+    process_shapefile_chunked, prepare_batch, read_page, read_columns, export_csv, remove_output, prune_outputs
+)
 from scripts.ui_styles import inject_custom_styles
+from scripts.warmup import warm_up
 
 st.set_page_config(page_title="Pavelength – Pavement Condition Explorer", layout="wide")
 inject_custom_styles()
 
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    # Runs once per server process: preload heavy modules while the uploader renders
+    return warm_up()
+
+if os.getenv("PAVELENGTH_WARMUP", "1") != "0":
+    start_warmup()
+
 header = st.columns([5, 1])
 with header[0]:
     st.markdown("""<h1>🚣️ Pavelength – Pavement Condition Explorer</h1>""", unsafe_allow_html=True)
 with header[1]:
     uploaded_zip = st.file_uploader("", label_visibility="collapsed", type=["zip"])
+    large_mode = st.checkbox("🧱 Large file mode", help="Process the shapefile in batches instead of loading it all into memory")
+
+PREVIEW_ROWS = 1000
+PAGE_SIZE = 1000
+CHUNKED_OUTPUT_MAX_AGE = 24 * 3600  # outputs left behind by ended sessions
 
 @st.cache_data(show_spinner=False)
 def load_data(uploaded_file):
     return extract_shapefile(uploaded_file)
 
+@st.cache_data(show_spinner=False, max_entries=3)
+def run_forecast(df, current_year, horizon, min_samples):
+    # Cached per scenario: same data + parameters reuse the previous projection
+    return prioritize_segments(df, current_year, horizon=horizon, min_samples=min_samples)
+
+@st.cache_data(show_spinner=False)
+def load_preview(uploaded_file):
+    return extract_shapefile(uploaded_file, rows=PREVIEW_ROWS)
+
+def run_chunked(uploaded_file, mapping, query_string):
+    # One output per session: a new mapping/query replaces (and deletes) the previous one
+    key = (getattr(uploaded_file, "file_id", uploaded_file.name), tuple(sorted(mapping.items())), query_string)
+    cached = st.session_state.get("chunked_result")
+    if cached:
+        cached_key, result = cached
+        if cached_key == key and (result["rows_kept"] == 0 or os.path.exists(result["path"])):
+            return result
+        remove_output(result)
+        del st.session_state["chunked_result"]
+
+    prune_outputs(CHUNKED_OUTPUT_MAX_AGE)
+    result = process_shapefile_chunked(uploaded_file, mapping, query_string=query_string)
+    st.session_state["chunked_result"] = (key, result)
+    return result
+
+def apply_chunked_query(user_query, preview, mapping):
+    # Validate on the preview before storing, so a bad query never blocks later reruns
+    try:
+        query_string = query_to_filter(user_query, mapping)
+        prepare_batch(preview.copy(), mapping, query_string=query_string)
+    except Exception as e:
+        st.error(f"❌ Error applying query: {e}")
+        return
+    st.info(f"🤠 Filter Applied: `{query_string}`")
+    st.session_state["chunked_query"] = query_string
+
+def render_forecast(get_forecast_input, pci_col, data_key):
+    st.subheader("📈 Deterioration Forecast & Prioritization")
+
+    fc_cols = st.columns(3)
+    with fc_cols[0]:
+        current_year = st.number_input("Survey year", min_value=1950, max_value=2100,
+                                       value=pd.Timestamp.today().year, step=1)
+    with fc_cols[1]:
+        horizon = st.slider("Forecast horizon (years)", min_value=1, max_value=20, value=5)
+    with fc_cols[2]:
+        min_samples = st.number_input("Min segments per curve", min_value=1, value=10, step=1)
+
+    if st.button("📈 Run Forecast"):
+        st.session_state["show_forecast"] = True
+
+    if st.session_state.get("show_forecast"):
+        forecast_input = get_forecast_input()
+        with st.spinner("📈 Projecting network condition..."):
+            ranked, curves = run_forecast(forecast_input, int(current_year), int(horizon), int(min_samples))
+
+        if pci_col in ranked.columns:
+            st.write(f"**Mean PCI now:** {ranked[pci_col].mean():.1f} → "
+                     f"**in {horizon} years:** {ranked['Projected PCI'].mean():.1f}")
+        else:
+            st.warning("⚠️ PCI is not mapped, so no projection can be made.")
+        missing_costs = unpriced_types(forecast_input)
+        if "Pavement type" not in forecast_input.columns:
+            st.info("ℹ️ Pavement type is not mapped; all segments are priced at 1.0 per unit area.")
+        elif missing_costs:
+            st.warning(f"⚠️ No unit cost for pavement types {missing_costs}; priced at 1.0 per unit area.")
+        with st.expander("Deterioration curves (PCI = 100 · e^(-rate · years))"):
+            st.dataframe(curves)
+        st.dataframe(ranked.head(500))
+
+        # Serializing the full priority list is slow, so only do it on request for this scenario
+        scenario = (data_key, int(current_year), int(horizon), int(min_samples))
+        if st.button("📄 Prepare Priority List CSV"):
+            st.session_state["forecast_csv"] = (scenario, ranked.to_csv(index=False))
+        cached_csv = st.session_state.get("forecast_csv")
+        if cached_csv and cached_csv[0] == scenario:
+            st.download_button("📅 Download Priority List", data=cached_csv[1],
+                               file_name="segment_priorities.csv")
+        elif cached_csv:
+            del st.session_state["forecast_csv"]
+
 if uploaded_zip:
     try:
-        gdf = load_data(uploaded_zip)
+        gdf = load_preview(uploaded_zip) if large_mode else load_data(uploaded_zip)
     except Exception as e:
         st.error(f"❌ Error reading shapefile: {e}")
         st.stop()
 
-    st.success(f"✅ Total rows loaded: {len(gdf)}")
+    if large_mode:
+        st.success(f"✅ Large file mode: previewing first {len(gdf)} rows. Full file is processed in batches after mapping.")
+    else:
+        st.success(f"✅ Total rows loaded: {len(gdf)}")
     columns = gdf.columns.tolist()
 
-    tab1, tab2, tab3 = st.tabs(["🧩 Column Mapping", "🗺️ Map View", "📊 Data Table"])
+    tab1, tab2, tab3, tab4 = st.tabs(["🧩 Column Mapping", "🗺️ Map View", "📊 Data Table", "📈 Forecast"])
 
-    for key in ["manual_mapping", "submitted_mapping", "show_map", "show_data", "active_tab"]:
+    for key in ["manual_mapping", "submitted_mapping", "show_map", "show_data", "show_forecast", "active_tab"]:
         if key not in st.session_state:
             st.session_state[key] = {} if 'mapping' in key else False
     if "filtered_gdf" not in st.session_state:
@@ -43,8 +145,12 @@ if uploaded_zip:
         st.subheader("📊 Shapefile Summary")
         if st.checkbox("Show 20 sample rows"):
             st.dataframe(gdf.head(20))
-        st.write(f"**Total rows:** {len(gdf)}")
-        st.write(f"**Duplicate rows:** {gdf.duplicated().sum()}")
+        if large_mode:
+            st.write(f"**Preview rows:** {len(gdf)} (full row count is shown after processing)")
+            st.write(f"**Duplicate rows in preview:** {gdf.duplicated().sum()}")
+        else:
+            st.write(f"**Total rows:** {len(gdf)}")
+            st.write(f"**Duplicate rows:** {gdf.duplicated().sum()}")
         st.write(f"**Projection:** {gdf.crs}")
 
         st.markdown("---")
@@ -80,7 +186,83 @@ if uploaded_zip:
                     st.session_state["submitted_mapping"] = True
                     st.success("✅ Mappings saved. You can now explore Map or Data tabs.")
 
-    if st.session_state["submitted_mapping"]:
+    if st.session_state["submitted_mapping"] and large_mode:
+        manual_mapping = st.session_state["manual_mapping"]
+        pci_col = "PCI"
+        segment_col = "Segment_ID"
+
+        if "chunked_query" not in st.session_state:
+            st.session_state["chunked_query"] = None
+
+        with tab2:
+            st.session_state["active_tab"] = "🗺️ Map View"
+            st.subheader("🗺️ Map View")
+
+            user_query = st.text_input("💬 Ask a pavement query (e.g., PCI < 40 and `Segment area` > 1000)", key="map_query")
+
+            if st.button("🔍 Apply Map Filter", key="map_filter") and user_query:
+                apply_chunked_query(user_query, gdf, manual_mapping)
+
+        with tab3:
+            st.session_state["active_tab"] = "📊 Data Table"
+            st.subheader("📋 Data Table")
+
+            user_query_data = st.text_input("🗘️ Ask a data query (e.g., Pavement type is AC and PCI > 50)", key="data_query")
+
+            if st.button("🔍 Apply Data Filter", key="data_filter") and user_query_data:
+                apply_chunked_query(user_query_data, gdf, manual_mapping)
+
+        try:
+            with st.spinner("🧱 Processing shapefile in batches..."):
+                result = run_chunked(uploaded_zip, manual_mapping, st.session_state["chunked_query"])
+        except Exception as e:
+            st.error(f"❌ Error processing shapefile: {e}")
+            st.stop()
+
+        n_pages = max(1, -(-result["rows_kept"] // PAGE_SIZE))
+
+        with tab2:
+            page = st.number_input(f"Page (of {n_pages}, {PAGE_SIZE} segments each)", min_value=1,
+                                   max_value=n_pages, value=1, step=1, key="map_page")
+            if st.button("📍 Show Map"):
+                st.session_state["show_map"] = True
+
+            if st.session_state.get("show_map"):
+                with st.spinner("🗺️ Loading map..."):
+                    render_map(read_page(result["path"], page - 1, PAGE_SIZE), pci_col, segment_col, manual_mapping)
+
+        with tab3:
+            st.write(f"**Total rows in file:** {result['rows_read']}  |  **Rows kept:** {result['rows_kept']}")
+            if result["pci_mean"] is not None:
+                st.write(f"**Mean PCI:** {result['pci_mean']:.1f}")
+            if result["pci_bands"]:
+                st.write("**PCI condition bands:**")
+                st.json(result["pci_bands"])
+            if result["zones"]:
+                st.write("**Segments by zone:**")
+                st.dataframe(pd.Series(result["zones"], name="Segments"))
+
+            page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages,
+                                   value=1, step=1, key="data_page")
+            data = read_page(result["path"], page - 1, PAGE_SIZE)
+            mapped_cols = [field for field in EXPECTED_FIELDS if field in data.columns]
+            st.dataframe(data[mapped_cols] if mapped_cols else data.drop(columns="geometry", errors="ignore"))
+
+            # The CSV is streamed to disk; it is only read into memory when the user asks for it
+            if st.button("📄 Prepare CSV"):
+                st.session_state["chunked_csv"] = export_csv(result["path"], mapped_cols)
+            csv_path = st.session_state.get("chunked_csv")
+            if csv_path and os.path.exists(csv_path):
+                with open(csv_path, "rb") as f:
+                    st.download_button("📅 Download CSV", data=f, file_name="filtered_segments.csv")
+
+        with tab4:
+            st.session_state["active_tab"] = "📈 Forecast"
+            # Columnar read: only the forecast fields are loaded, never the geometry
+            forecast_cols = [segment_col] + FORECAST_FIELDS
+            render_forecast(lambda: read_columns(result["path"], forecast_cols), pci_col, result["path"])
+
+    elif st.session_state["submitted_mapping"]:
         manual_mapping = st.session_state["manual_mapping"]
 
         # Standardize all expected fields
@@ -170,3 +352,9 @@ if uploaded_zip:
                 else:
                     st.warning("⚠️ No valid mapped columns to display. Showing raw sample data.")
                     st.dataframe(data.head(20))
+
+        with tab4:
+            st.session_state["active_tab"] = "📈 Forecast"
+            forecast_cols = [segment_col] + FORECAST_FIELDS
+            data_key = (getattr(uploaded_zip, "file_id", uploaded_zip.name), tuple(sorted(manual_mapping.items())))
+            render_forecast(lambda: pd.DataFrame(gdf[[c for c in forecast_cols if c in gdf.columns]]), pci_col, data_key)
@@ -0,0 +1,248 @@
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+from scripts.file_parser import unzip_shapefile, clean_frame
+from scripts.filters import apply_filters
+from scripts.llm_mapper import EXPECTED_FIELDS
+
+DEFAULT_BATCH_SIZE = 50_000
+
+# All chunked outputs live here so they can be found and cleaned up
+OUTPUT_ROOT = os.path.join(tempfile.gettempdir(), "pavelength")
+
+# Same condition bands as the PCI pie chart
+PCI_BINS = [0, 40, 70, 100]
+PCI_LABELS = ["Poor", "Fair", "Good"]
+
+
+def iter_shapefile_batches(shp_path, batch_size=DEFAULT_BATCH_SIZE):
+    """Yields cleaned GeoDataFrames of at most `batch_size` rows from a shapefile."""
+    import geopandas as gpd
+
+    start = 0
+    while True:
+        batch = gpd.read_file(shp_path, rows=slice(start, start + batch_size))
+        if batch.empty:
+            return
+        yield clean_frame(batch)
+        if len(batch) < batch_size:
+            return
+        start += batch_size
+
+
+def prepare_batch(gdf, mapping, filters=None, query_string=None):
+    """
+    Applies the in-memory pipeline to one batch: standardize mapped fields, coerce PCI,
+    drop invalid geometries, then apply filters and an optional pandas query string.
+    """
+    for expected_col in EXPECTED_FIELDS:
+        actual_col = mapping.get(expected_col)
+        if actual_col and actual_col != expected_col and actual_col in gdf.columns:
+            gdf[expected_col] = gdf[actual_col]
+
+    if "PCI" in gdf.columns:
+        # Always float, so a batch of whole-number PCI doesn't fix the Parquet column to int64
+        gdf["PCI"] = pd.to_numeric(gdf["PCI"], errors="coerce").astype("float64")
+        gdf = gdf.dropna(subset=["PCI"])
+
+    gdf = gdf[gdf.geometry.notnull() & gdf.geometry.is_valid]
+
+    if filters:
+        gdf = apply_filters(gdf, **filters)
+    if query_string and not gdf.empty:
+        gdf = gdf.query(query_string, engine="python")
+    return gdf
+
+
+def _to_table(gdf, schema=None):
+    import pyarrow as pa
+
+    df = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+    df["geometry"] = gdf.geometry.to_wkb()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return table.cast(schema) if schema is not None else table
+
+
+def _writer_schema(table):
+    """
+    Schema for the whole run, taken from the first kept batch. Columns that are entirely
+    null there (inferred as pa.null()) become strings, since only text/date attributes
+    come back as all-None objects from a shapefile; numeric ones are NaN floats. Integer
+    columns are widened to float64 so later batches with decimals or nulls still fit.
+    """
+    import pyarrow as pa
+
+    def widen(field):
+        if pa.types.is_null(field.type):
+            return field.with_type(pa.string())
+        if pa.types.is_integer(field.type):
+            return field.with_type(pa.float64())
+        return field
+
+    return pa.schema([widen(field) for field in table.schema])
+
+
+def _update_aggregates(agg, gdf):
+    agg["rows_kept"] += len(gdf)
+    if gdf.empty:
+        return
+
+    if "PCI" in gdf.columns:
+        pci = gdf["PCI"]
+        agg["pci_sum"] += float(pci.sum())
+        agg["pci_count"] += int(pci.count())
+        bands = pd.cut(pci, bins=PCI_BINS, labels=PCI_LABELS).value_counts()
+        for label, count in bands.items():
+            agg["pci_bands"][label] = agg["pci_bands"].get(label, 0) + int(count)
+
+    if "Zone" in gdf.columns:
+        for zone, count in gdf["Zone"].value_counts().items():
+            agg["zones"][zone] = agg["zones"].get(zone, 0) + int(count)
+
+
+def process_shapefile_chunked(uploaded_zip, mapping, filters=None, query_string=None,
+                              batch_size=DEFAULT_BATCH_SIZE, out_dir=None):
+    """
+    Streams a zipped shapefile through `prepare_batch` and writes the kept rows to a
+    Parquet file (geometry as WKB), so only one batch is held in memory at a time.
+
+    Parameters:
+    - uploaded_zip: uploaded ZIP file containing the shapefile.
+    - mapping: expected field -> actual column mapping.
+    - filters: keyword arguments for `apply_filters`.
+    - query_string: optional pandas query applied to each batch.
+    - batch_size: rows read per batch.
+    - out_dir: directory for the Parquet output (defaults to a new directory under OUTPUT_ROOT,
+      removed again if processing fails; use `remove_output` once the result is no longer needed).
+
+    Returns:
+    - dict of aggregates, including 'path' to the Parquet output.
+    """
+    import pyarrow.parquet as pq
+
+    owns_dir = out_dir is None
+    if owns_dir:
+        os.makedirs(OUTPUT_ROOT, exist_ok=True)
+        out_dir = tempfile.mkdtemp(prefix="run_", dir=OUTPUT_ROOT)
+    out_path = os.path.join(out_dir, "segments.parquet")
+    agg = {
+        "path": out_path,
+        "rows_read": 0,
+        "rows_kept": 0,
+        "pci_sum": 0.0,
+        "pci_count": 0,
+        "pci_bands": {},
+        "zones": {},
+    }
+
+    writer = None
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            shp_path = unzip_shapefile(uploaded_zip, tmpdir)
+            for batch in iter_shapefile_batches(shp_path, batch_size):
+                agg["rows_read"] += len(batch)
+                batch = prepare_batch(batch, mapping, filters, query_string)
+                _update_aggregates(agg, batch)
+                if batch.empty:
+                    continue
+                if writer is None:
+                    table = _to_table(batch)
+                    schema = _writer_schema(table)
+                    writer = pq.ParquetWriter(out_path, schema)
+                    table = table.cast(schema)
+                else:
+                    table = _to_table(batch, writer.schema)
+                writer.write_table(table)
+    except Exception:
+        # Close before removing the directory, so nothing is flushed into a deleted path
+        if writer is not None:
+            writer.close()
+            writer = None
+        if owns_dir:
+            shutil.rmtree(out_dir, ignore_errors=True)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+
+    agg["pci_mean"] = agg["pci_sum"] / agg["pci_count"] if agg["pci_count"] else None
+    return agg
+
+
+def read_page(path, page, page_size):
+    """Reads rows [page * page_size, (page + 1) * page_size) back as a GeoDataFrame."""
+    import geopandas as gpd
+    import pyarrow.parquet as pq
+
+    if not os.path.exists(path):
+        return gpd.GeoDataFrame()
+
+    pf = pq.ParquetFile(path)
+    start, stop = page * page_size, (page + 1) * page_size
+    offset, groups = 0, []
+    for i in range(pf.metadata.num_row_groups):
+        n = pf.metadata.row_group(i).num_rows
+        if offset + n > start and offset < stop:
+            groups.append(i)
+        offset += n
+
+    if not groups:
+        return gpd.GeoDataFrame()
+
+    first_offset = sum(pf.metadata.row_group(i).num_rows for i in range(groups[0]))
+    df = pf.read_row_groups(groups).to_pandas()
+    df = df.iloc[start - first_offset:stop - first_offset].reset_index(drop=True)
+    geometry = gpd.GeoSeries.from_wkb(df.pop("geometry"), crs="EPSG:4326")
+    return gpd.GeoDataFrame(df, geometry=geometry)
+
+
+def read_columns(path, columns):
+    """Reads only the requested columns (those present) from the Parquet output."""
+    import pyarrow.parquet as pq
+
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+    stored = pq.read_schema(path).names
+    return pq.read_table(path, columns=[c for c in columns if c in stored]).to_pandas()
+
+
+def export_csv(path, columns=None):
+    """
+    Streams the Parquet output to a CSV file next to it, one row group at a time,
+    leaving out the geometry. Returns the CSV path (None if there is no output).
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    if not os.path.exists(path):
+        return None
+
+    pf = pq.ParquetFile(path)
+    stored = [name for name in pf.schema_arrow.names if name != "geometry"]
+    columns = [c for c in (columns or stored) if c in stored] or stored
+    csv_path = os.path.splitext(path)[0] + ".csv"
+    with pacsv.CSVWriter(csv_path, pa.schema([pf.schema_arrow.field(c) for c in columns])) as writer:
+        for batch in pf.iter_batches(columns=columns):
+            writer.write_batch(batch)
+    return csv_path
+
+
+def remove_output(result):
+    """Deletes the output directory of a `process_shapefile_chunked` result."""
+    out_dir = os.path.dirname(result["path"])
+    if os.path.dirname(out_dir) == OUTPUT_ROOT:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def prune_outputs(max_age_seconds):
+    """Deletes outputs under OUTPUT_ROOT not modified for `max_age_seconds` (e.g. from ended sessions)."""
+    if not os.path.isdir(OUTPUT_ROOT):
+        return
+    cutoff = time.time() - max_age_seconds
+    for name in os.listdir(OUTPUT_ROOT):
+        out_dir = os.path.join(OUTPUT_ROOT, name)
+        if os.path.isdir(out_dir) and os.path.getmtime(out_dir) < cutoff:
+            shutil.rmtree(out_dir, ignore_errors=True)
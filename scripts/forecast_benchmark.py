@@ -0,0 +1,36 @@
+"""
+Times `prioritize_segments` on a synthetic network. Run from the repository root:
+
+    python -m scripts.forecast_benchmark [n_segments]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from scripts.forecasting import prioritize_segments
+
+
+def synthetic_network(n, seed=0):
+    rng = np.random.default_rng(seed)
+    age = rng.uniform(1, 40, n)
+    return pd.DataFrame({
+        "Segment_ID": np.arange(n),
+        "PCI": np.clip(100 * np.exp(-0.03 * age) + rng.normal(0, 5, n), 0, 100),
+        "Pavement age": age,
+        "Last rehab year": np.where(rng.random(n) < 0.5, 2025 - age, np.nan),
+        "AADT": rng.uniform(50, 50000, n),
+        "Pavement type": rng.choice(["AC", "PCC", "Asphalt", "Concrete"], n),
+        "Zone": rng.choice([f"Zone {i}" for i in range(20)], n),
+        "Segment area": rng.uniform(50, 20000, n),
+    })
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    df = synthetic_network(n)
+    start = time.perf_counter()
+    ranked, curves = prioritize_segments(df, current_year=2025)
+    elapsed = time.perf_counter() - start
+    print(f"{n} segments, {len(curves)} curves: {elapsed:.2f} s")
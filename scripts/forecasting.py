@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+FORECAST_FIELDS = ["PCI", "Pavement age", "Last rehab year", "AADT", "Pavement type", "Zone", "Segment area"]
+
+# Relative treatment cost per unit area by pavement type (used when no costs are supplied)
+DEFAULT_UNIT_COSTS = {
+    "Asphalt": 1.0,
+    "Concrete": 1.6,
+}
+
+# Common pavement type codes, matched case-insensitively, mapped to DEFAULT_UNIT_COSTS keys
+PAVEMENT_TYPE_ALIASES = {
+    "asphalt": "Asphalt",
+    "ac": "Asphalt",
+    "hma": "Asphalt",
+    "asphalt concrete": "Asphalt",
+    "bituminous": "Asphalt",
+    "concrete": "Concrete",
+    "pcc": "Concrete",
+    "portland cement concrete": "Concrete",
+    "jpcp": "Concrete",
+    "crcp": "Concrete",
+}
+
+# Fallback deterioration rate (per year) when a group has too few usable segments
+DEFAULT_DECAY_RATE = 0.03
+
+
+def _numeric(df, col):
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+
+def _labels(df, col):
+    if col not in df.columns:
+        return np.full(len(df), "Unknown", dtype=object)
+    return df[col].fillna("Unknown").astype(str).to_numpy()
+
+
+def normalize_pavement_types(labels):
+    """Maps known pavement type codes (e.g. 'AC', 'PCC') to canonical names; others pass through."""
+    codes, uniques = pd.factorize(np.asarray(labels, dtype=object))
+    uniques = pd.Series(uniques, dtype=object)
+    canonical = uniques.str.strip().str.lower().map(PAVEMENT_TYPE_ALIASES).fillna(uniques)
+    return canonical.to_numpy()[codes]
+
+
+def unpriced_types(df, unit_costs=None):
+    """
+    Returns the pavement types in `df` that have no unit cost (and are priced at 1.0).
+    Empty when 'Pavement type' is not mapped at all.
+    """
+    if "Pavement type" not in df.columns:
+        return []
+    unit_costs = DEFAULT_UNIT_COSTS if unit_costs is None else unit_costs
+    types = pd.unique(_types(df))
+    return sorted(t for t in types if t not in unit_costs)
+
+
+def _types(df):
+    return normalize_pavement_types(_labels(df, "Pavement type"))
+
+
+def _years_in_service(df, current_year):
+    """Years since last rehab, falling back to pavement age where rehab year is missing."""
+    rehab_year = _numeric(df, "Last rehab year")
+    age = current_year - rehab_year
+    age = np.where(np.isfinite(age) & (age >= 0), age, _numeric(df, "Pavement age"))
+    return np.where(np.isfinite(age) & (age >= 0), age, np.nan)
+
+
+def _group_rates(codes, n_groups, age, log_pci, usable):
+    """
+    Least-squares fit of ln(PCI/100) = -k * age through the origin for every group at once.
+
+    Returns (rates, counts) arrays indexed by group code.
+    """
+    codes = codes[usable]
+    sxy = np.bincount(codes, weights=age[usable] * log_pci[usable], minlength=n_groups)
+    sxx = np.bincount(codes, weights=age[usable] ** 2, minlength=n_groups)
+    counts = np.bincount(codes, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rates = np.where(sxx > 0, -sxy / sxx, np.nan)
+    return np.clip(rates, 0, None), counts
+
+
+def fit_deterioration_curves(df, current_year, min_samples=10):
+    """
+    Fits exponential deterioration curves PCI(t) = 100 * exp(-k * t) per pavement type and zone.
+
+    Groups with fewer than `min_samples` usable segments fall back to the pavement type
+    curve, then to the network-wide curve, then to DEFAULT_DECAY_RATE.
+
+    Parameters:
+    - df: DataFrame with standardized column names.
+    - current_year: year the PCI values were observed.
+    - min_samples: minimum segments needed to trust a group's own fit.
+
+    Returns:
+    - DataFrame with one row per (Pavement type, Zone) and its decay rate.
+    """
+    pci = _numeric(df, "PCI")
+    age = _years_in_service(df, current_year)
+    usable = np.isfinite(pci) & (pci > 0) & (pci <= 100) & np.isfinite(age) & (age > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pci = np.log(pci / 100.0)
+
+    types = _types(df)
+    zones = _labels(df, "Zone")
+    group_index = pd.MultiIndex.from_arrays([types, zones])
+    group_codes, groups = pd.factorize(group_index)
+    type_codes, type_values = pd.factorize(types)
+
+    group_rates, group_counts = _group_rates(group_codes, len(groups), age, log_pci, usable)
+    type_rates, type_counts = _group_rates(type_codes, len(type_values), age, log_pci, usable)
+    global_rate, global_count = _group_rates(np.zeros(len(df), dtype=np.int64), 1, age, log_pci, usable)
+
+    network_rate = global_rate[0] if global_count[0] >= min_samples else DEFAULT_DECAY_RATE
+    type_rates = np.where(type_counts >= min_samples, type_rates, network_rate)
+
+    # Map each group to its pavement type's fallback rate
+    group_types = groups.get_level_values(0)
+    group_type_codes = pd.Index(type_values).get_indexer(group_types)
+    rates = np.where(group_counts >= min_samples, group_rates, type_rates[group_type_codes])
+
+    return pd.DataFrame({
+        "Pavement type": group_types,
+        "Zone": groups.get_level_values(1),
+        "Decay rate": rates,
+        "Samples": group_counts,
+    })
+
+
+def project_pci(df, curves, horizon):
+    """
+    Projects PCI `horizon` years ahead using the fitted curves.
+
+    The projection follows the segment's group curve from its current PCI, so segments
+    already better or worse than the curve keep their offset in age terms.
+
+    Returns:
+    - NumPy array of projected PCI values aligned with `df`.
+    """
+    pci = _numeric(df, "PCI")
+    lookup = pd.MultiIndex.from_arrays([curves["Pavement type"], curves["Zone"]])
+    keys = pd.MultiIndex.from_arrays([_types(df), _labels(df, "Zone")])
+    idx = lookup.get_indexer(keys)
+    rates = np.where(idx >= 0, curves["Decay rate"].to_numpy()[idx], DEFAULT_DECAY_RATE)
+    return np.clip(pci * np.exp(-rates * horizon), 0, 100)
+
+
+def prioritize_segments(df, current_year, horizon=5, unit_costs=None, min_samples=10):
+    """
+    Projects PCI and ranks segments for treatment by cost-benefit score.
+
+    The score is benefit per unit cost for one unit of area treated, so segment size does
+    not change the ranking:
+
+        score   = (100 - projected PCI) * (1 + ln(1 + AADT)) / unit cost(pavement type)
+        benefit = score * unit cost * area    (segment totals, for budgeting)
+        cost    = unit cost * area
+
+    Pavement types are normalized with PAVEMENT_TYPE_ALIASES before the cost lookup;
+    types still without a unit cost are priced at 1.0 (see `unpriced_types`). Segments
+    with a missing or non-positive area are still scored, but their 'Benefit' and 'Cost'
+    totals are NaN; when 'Segment area' is absent, every segment counts as one unit.
+
+    Parameters:
+    - df: DataFrame with standardized column names.
+    - current_year: year the PCI values were observed.
+    - horizon: forecast horizon in years.
+    - unit_costs: dict of relative unit cost by pavement type (defaults to DEFAULT_UNIT_COSTS).
+    - min_samples: minimum segments needed to trust a group's own curve.
+
+    Returns:
+    - (ranked DataFrame, curves DataFrame). The ranked frame keeps the input columns and adds
+      'Projected PCI', 'PCI loss', 'Benefit', 'Cost', 'Score' and 'Priority' (1 = treat first).
+    """
+    unit_costs = DEFAULT_UNIT_COSTS if unit_costs is None else unit_costs
+    curves = fit_deterioration_curves(df, current_year, min_samples=min_samples)
+
+    pci = _numeric(df, "PCI")
+    projected = project_pci(df, curves, horizon)
+    aadt = np.nan_to_num(_numeric(df, "AADT"), nan=0.0).clip(min=0)
+    if "Segment area" in df.columns:
+        area = _numeric(df, "Segment area")
+        area = np.where(np.isfinite(area) & (area > 0), area, np.nan)
+    else:
+        area = np.ones(len(df))
+    unit_cost = pd.Series(_types(df)).map(unit_costs).fillna(1.0).to_numpy(dtype=float)
+
+    unit_benefit = (100.0 - projected) * (1.0 + np.log1p(aadt))
+    score = unit_benefit / unit_cost
+    benefit = unit_benefit * area
+    cost = unit_cost * area
+
+    result = df.copy()
+    result["Projected PCI"] = projected
+    result["PCI loss"] = pci - projected
+    result["Benefit"] = benefit
+    result["Cost"] = cost
+    result["Score"] = score
+    result["Priority"] = pd.Series(score, index=result.index).rank(ascending=False, method="first")
+    result = result.sort_values("Priority", na_position="last")
+
+    return result, curves
@@ -1,4 +1,3 @@
-import openai
 import os
 import streamlit as st
 
@@ -61,6 +60,8 @@ Respond like this:
 Only include mappings you are confident about. Do not guess if unclear.
 """
 
+    import openai
+
     openai.api_key = st.secrets.get("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY"))
 
     client = openai.OpenAI()
@@ -1,4 +1,3 @@
-import openai
 import os
 import streamlit as st
 
@@ -23,6 +22,8 @@ def query_to_filter(user_query, column_mapping):
     Converts a natural language query to a Pandas-compatible query string using OpenAI,
     including context-aware logic for pavement engineering (ASTM D6433).
     """
+    import openai
+
     openai.api_key = st.secrets.get("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY"))
 
     expected_to_actual = {field: column_mapping.get(field, field) for field in EXPECTED_FIELDS}
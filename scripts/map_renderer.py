@@ -1,8 +1,9 @@
-import folium
-from streamlit_folium import st_folium
 from scripts.llm_mapper import EXPECTED_FIELDS
 
 def render_map(gdf, pci_col, segment_col, mapping=None):
+    import folium
+    from streamlit_folium import st_folium
+
     if gdf.empty:
         return st_folium(folium.Map(location=[0, 0], zoom_start=2), width=1200, height=700)
 
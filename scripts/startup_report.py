@@ -0,0 +1,78 @@
+"""
+Measures cold import time for app.py's import block, every module under scripts/ and the
+heavy dependencies.
+
+Each import runs in a fresh interpreter (median of several runs) so results are not
+skewed by modules already loaded. Run from the repository root, optionally pointing at
+another checkout (e.g. a worktree of an older commit) to compare:
+
+    python -m scripts.startup_report [repo_root]
+"""
+import ast
+import os
+import pkgutil
+import statistics
+import subprocess
+import sys
+
+from scripts.warmup import HEAVY_MODULES
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+_TIMER = (
+    "import time; t = time.perf_counter()\n"
+    "{code}\n"
+    "print(time.perf_counter() - t)"
+)
+
+
+def app_imports(root):
+    """Returns the top-level import statements of app.py as source code."""
+    with open(os.path.join(root, "app.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports)
+
+
+def script_modules(root):
+    package_dir = os.path.join(root, "scripts")
+    return [f"scripts.{m.name}" for m in pkgutil.iter_modules([package_dir]) if m.name != "startup_report"]
+
+
+def time_import(code, root):
+    """Returns the median cold time in seconds for `code`, or the error line if it fails."""
+    times = []
+    for _ in range(RUNS):
+        proc = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(code=code)],
+            cwd=root, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return lines[-1] if lines else "import failed"
+        times.append(float(proc.stdout.strip().splitlines()[-1]))
+    return statistics.median(times)
+
+
+def build_report(entries, root):
+    rows = []
+    for label, code in entries:
+        result = time_import(code, root)
+        cell = f"{result * 1000:9.1f} ms" if isinstance(result, float) else f"   error: {result}"
+        rows.append(f"{label:<32}{cell}")
+    return "\n".join(rows)
+
+
+if __name__ == "__main__":
+    root = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else REPO_ROOT
+    print(f"Cold import times for {root} (median of {RUNS} runs)")
+    print()
+    print("app.py import block")
+    print(build_report([("app.py imports", app_imports(root))], root))
+    print()
+    print("Module tree (scripts/)")
+    print(build_report([(name, f"import {name}") for name in script_modules(root)], root))
+    print()
+    print("Heavy dependencies (deferred until used)")
+    print(build_report([(name, f"import {name}") for name in HEAVY_MODULES + ["matplotlib.pyplot"]], root))
@@ -1,8 +1,9 @@
 # scripts/visualizations.py
 import pandas as pd
-import matplotlib.pyplot as plt
 
 def pci_pie_chart(gdf, pci_col="PCI"):
+    import matplotlib.pyplot as plt
+
     bins = [0, 40, 70, 100]
     labels = ["Poor", "Fair", "Good"]
     # Convert to numeric and coerce errors
@@ -18,6 +19,8 @@ def functional_class_bar(gdf, col):
     if not col or col == "None" or col not in gdf.columns:
         return None
 
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots()
     gdf[col].value_counts().plot.bar(ax=ax, color="skyblue")
     ax.set_title("Segments by Functional Class")
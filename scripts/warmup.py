@@ -0,0 +1,28 @@
+import importlib
+import threading
+
+# Heavy dependencies that app.py's features import lazily (matplotlib is left out: app.py
+# does not use scripts.visualizations)
+HEAVY_MODULES = [
+    "geopandas",
+    "pyarrow.parquet",
+    "folium",
+    "streamlit_folium",
+    "openai",
+]
+
+
+def _import_all(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            # Missing optional packages surface when the feature is actually used
+            pass
+
+
+def warm_up(modules=HEAVY_MODULES):
+    """Imports the heavy modules on a background daemon thread and returns the thread."""
+    thread = threading.Thread(target=_import_all, args=(list(modules),), name="pavelength-warmup", daemon=True)
+    thread.start()
+    return thread
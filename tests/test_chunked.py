@@ -0,0 +1,93 @@
+import io
+import os
+import zipfile
+
+import geopandas as gpd
+import pytest
+from shapely.geometry import LineString
+
+from scripts.chunked import process_shapefile_chunked, read_page, read_columns, export_csv, remove_output
+
+
+def _zipped_shapefile(tmp_path, n=30, pci=None):
+    gdf = gpd.GeoDataFrame(
+        {
+            "seg": range(n),
+            "pci": pci if pci is not None else [20.0 + i for i in range(n)],
+            # Text attribute that is empty for the whole first batch
+            "note": [None] * 20 + ["patched"] * (n - 20),
+        },
+        geometry=[LineString([(i, 0), (i + 1, 1)]) for i in range(n)],
+        crs="EPSG:4326",
+    )
+    shp_dir = tmp_path / "shp"
+    shp_dir.mkdir()
+    gdf.to_file(shp_dir / "network.shp")
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name in os.listdir(shp_dir):
+            zf.write(shp_dir / name, name)
+    return buf
+
+
+def test_batches_stream_to_parquet_with_sparse_columns(tmp_path):
+    mapping = {"Segment_ID": "seg", "PCI": "pci"}
+    result = process_shapefile_chunked(_zipped_shapefile(tmp_path), mapping, batch_size=10)
+    try:
+        assert result["rows_read"] == 30
+        assert result["rows_kept"] == 30
+        assert result["pci_bands"] == {"Poor": 21, "Fair": 9, "Good": 0}
+
+        page = read_page(result["path"], page=2, page_size=10)
+        assert list(page["Segment_ID"]) == list(range(20, 30))
+        assert (page["note"] == "patched").all()
+        assert list(read_columns(result["path"], ["PCI", "Missing"]).columns) == ["PCI"]
+    finally:
+        remove_output(result)
+    assert not os.path.exists(os.path.dirname(result["path"]))
+
+
+def test_query_filters_each_batch_and_exports_csv(tmp_path):
+    mapping = {"Segment_ID": "seg", "PCI": "pci"}
+    result = process_shapefile_chunked(_zipped_shapefile(tmp_path), mapping, query_string="`PCI` >= 45", batch_size=10)
+    try:
+        assert result["rows_kept"] == 5
+        csv_path = export_csv(result["path"], ["Segment_ID", "PCI"])
+        with open(csv_path) as f:
+            lines = f.read().splitlines()
+        assert lines[0] == '"Segment_ID","PCI"'
+        assert len(lines) == 6
+    finally:
+        remove_output(result)
+
+
+def test_whole_number_pci_in_first_batch_allows_decimals_later(tmp_path):
+    # Text PCI: "20".."29" in the first batch parse as integers, later batches have decimals
+    pci = [str(20 + i) for i in range(10)] + [f"{30 + i}.5" for i in range(20)]
+    mapping = {"Segment_ID": "seg", "PCI": "pci"}
+    result = process_shapefile_chunked(_zipped_shapefile(tmp_path, pci=pci), mapping, batch_size=10)
+    try:
+        assert result["rows_kept"] == 30
+        assert list(read_page(result["path"], page=1, page_size=10)["PCI"]) == [30.5 + i for i in range(10)]
+    finally:
+        remove_output(result)
+
+
+def test_failed_run_removes_its_output(tmp_path, monkeypatch):
+    from scripts import chunked
+
+    calls = []
+    real_prepare = chunked.prepare_batch
+
+    def failing_prepare(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise ValueError("bad batch")
+        return real_prepare(*args, **kwargs)
+
+    monkeypatch.setattr(chunked, "OUTPUT_ROOT", str(tmp_path / "out"))
+    monkeypatch.setattr(chunked, "prepare_batch", failing_prepare)
+    with pytest.raises(ValueError):
+        process_shapefile_chunked(_zipped_shapefile(tmp_path), {"PCI": "pci"}, batch_size=10)
+    assert os.listdir(tmp_path / "out") == []
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from scripts.forecasting import (
+    fit_deterioration_curves,
+    prioritize_segments,
+    project_pci,
+    unpriced_types,
+    DEFAULT_DECAY_RATE,
+)
+
+
+def _network(n, rate, pavement_type="Asphalt", zone="North", seed=0):
+    rng = np.random.default_rng(seed)
+    age = rng.uniform(1, 30, n)
+    return pd.DataFrame({
+        "PCI": 100 * np.exp(-rate * age),
+        "Pavement age": age,
+        "AADT": rng.uniform(100, 10000, n),
+        "Pavement type": pavement_type,
+        "Zone": zone,
+        "Segment area": rng.uniform(100, 5000, n),
+    })
+
+
+def test_known_decay_rate_is_recovered():
+    df = pd.concat([_network(200, 0.02, "Asphalt"), _network(200, 0.05, "Concrete", seed=1)])
+    curves = fit_deterioration_curves(df, current_year=2025).set_index("Pavement type")
+    assert np.isclose(curves.loc["Asphalt", "Decay rate"], 0.02)
+    assert np.isclose(curves.loc["Concrete", "Decay rate"], 0.05)
+
+
+def test_sparse_group_falls_back_to_type_then_default():
+    df = pd.concat([_network(100, 0.04, zone="North"), _network(3, 0.5, zone="South", seed=1)])
+    curves = fit_deterioration_curves(df, current_year=2025).set_index("Zone")
+    # South has too few segments, so it uses the Asphalt-wide fit (dominated by North)
+    assert curves.loc["South", "Decay rate"] < 0.1
+
+    tiny = _network(3, 0.5)
+    assert fit_deterioration_curves(tiny, 2025)["Decay rate"].iloc[0] == DEFAULT_DECAY_RATE
+
+
+def test_projection_follows_curve():
+    df = _network(50, 0.03)
+    curves = fit_deterioration_curves(df, 2025)
+    projected = project_pci(df, curves, horizon=5)
+    assert np.allclose(projected, df["PCI"] * np.exp(-0.03 * 5))
+
+
+def test_ranking_uses_condition_traffic_and_unit_cost_not_area():
+    df = pd.DataFrame({
+        "PCI": [60.0, 10.0, 10.0, 10.0],
+        "Pavement age": [5.0, 20.0, 20.0, 20.0],
+        "AADT": [1000.0, 1000.0, 1000.0, 1000.0],
+        "Pavement type": ["AC", "AC", "PCC", "AC"],
+        "Zone": ["North"] * 4,
+        "Segment area": [10000.0, 10.0, 10.0, None],
+    }, index=["good_ac", "poor_ac", "poor_pcc", "poor_ac_no_area"])
+    ranked, _ = prioritize_segments(df, current_year=2025)
+    # Poor asphalt outranks poor concrete (higher unit cost), which outranks good asphalt;
+    # segment size plays no part and unknown area is still scored
+    assert ranked.loc["poor_ac", "Score"] == ranked.loc["poor_ac_no_area", "Score"]
+    assert ranked.loc["poor_ac", "Priority"] < ranked.loc["poor_pcc", "Priority"] < ranked.loc["good_ac", "Priority"]
+    assert np.isnan(ranked.loc["poor_ac_no_area", "Cost"])
+
+
+def test_unmapped_pavement_type_is_not_reported_as_unpriced():
+    assert unpriced_types(pd.DataFrame({"PCI": [50.0]})) == []
+
+
+def test_pavement_type_codes_are_normalized_for_costs():
+    df = pd.DataFrame({"Pavement type": ["AC", " pcc ", "Gravel"]})
+    assert unpriced_types(df) == ["Gravel"]